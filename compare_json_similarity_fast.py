@@ -1,14 +1,72 @@
+import sys
 import json
 import argparse
+from contextlib import redirect_stdout
 from tqdm import tqdm
 import multiprocessing
 from concurrent.futures import ProcessPoolExecutor
-from functools import partial
+from functools import lru_cache, partial
 import itertools
+import heapq
 import re
 
+try:
+    import orjson
+except ImportError:  # Optional dependency; fall back to the stdlib json module
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional dependency; fall back to loading the whole document
+    ijson = None
+
+# Common C printf style format specifiers
+FORMAT_SPECIFIER_RE = re.compile(r'%[-#+ 0]*\*?(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlL]?[diouxXeEfFgGaAcspn%]')
+
+# Regex patterns substituted for each format specifier type
+FORMAT_REPLACEMENTS = {
+    '%s': r'.*?',       # String: any characters (non-greedy)
+    '%d': r'[+-]?\d+',  # Integer
+    '%i': r'[+-]?\d+',  # Integer
+    '%o': r'[0-7]+',    # Octal
+    '%u': r'\d+',       # Unsigned integer
+    '%x': r'[0-9a-fA-F]+',  # Hexadecimal (lowercase)
+    '%X': r'[0-9a-fA-F]+',  # Hexadecimal (uppercase)
+    '%f': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # Float
+    '%F': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # Float
+    '%e': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # Scientific notation
+    '%E': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # Scientific notation
+    '%g': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # General float
+    '%G': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # General float
+    '%c': r'.',         # Single character
+    '%p': r'0x[0-9a-fA-F]+',  # Pointer
+    '%%': r'%'          # Literal %
+}
+
+def load_json_lines_streaming(file_path):
+    """Loads a JSON array of strings from a file one item at a time using ijson."""
+    data = []
+    with open(file_path, 'rb') as f:
+        events = ijson.basic_parse(f)
+        first_event, _ = next(events, (None, None))
+        if first_event != 'start_array':
+            raise ValueError(f"Expected a JSON array of strings in {file_path}")
+        for event, value in events:
+            if event == 'string':
+                data.append(value)
+            elif event == 'end_array':
+                break
+            else:
+                raise ValueError(f"Expected a JSON array of strings in {file_path}")
+        # Drain the parser so trailing content is still reported as invalid JSON
+        for _ in events:
+            raise ValueError(f"Expected a JSON array of strings in {file_path}")
+    return data
+
 def load_json_lines(file_path):
     """Loads a JSON array of strings from a file."""
+    if ijson is not None:
+        return load_json_lines_streaming(file_path)
     with open(file_path, 'r') as f:
         data = json.load(f)
         if not isinstance(data, list) or not all(isinstance(item, str) for item in data):
@@ -22,15 +80,12 @@ def normalize_text(text):
 
 def has_format_specifiers(text):
     """Check if text contains C printf style format specifiers."""
-    # Common C printf format specifiers
-    format_pattern = r'%[-#+ 0]*\*?(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlL]?[diouxXeEfFgGaAcspn%]'
-    return bool(re.search(format_pattern, text))
+    return bool(FORMAT_SPECIFIER_RE.search(text))
 
 def convert_to_regex_pattern(text):
     """Convert a string with format specifiers to a regex pattern."""
     # First identify and temporarily replace format specifiers with placeholders
-    format_pattern = r'%[-#+ 0]*\*?(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlL]?[diouxXeEfFgGaAcspn%]'
-    specifiers = re.findall(format_pattern, text)
+    specifiers = FORMAT_SPECIFIER_RE.findall(text)
     
     # Replace format specifiers with unique placeholders
     temp_text = text
@@ -43,26 +98,6 @@ def convert_to_regex_pattern(text):
     # Escape the text (now without format specifiers)
     escaped_text = re.escape(temp_text)
     
-    # Define regex patterns for different format specifier types
-    format_replacements = {
-        '%s': r'.*?',       # String: any characters (non-greedy)
-        '%d': r'[+-]?\d+',  # Integer
-        '%i': r'[+-]?\d+',  # Integer
-        '%o': r'[0-7]+',    # Octal
-        '%u': r'\d+',       # Unsigned integer
-        '%x': r'[0-9a-fA-F]+',  # Hexadecimal (lowercase)
-        '%X': r'[0-9a-fA-F]+',  # Hexadecimal (uppercase)
-        '%f': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # Float
-        '%F': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # Float
-        '%e': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # Scientific notation
-        '%E': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # Scientific notation
-        '%g': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # General float
-        '%G': r'[+-]?\d*\.?\d+(?:[eE][+-]?\d+)?',  # General float
-        '%c': r'.',         # Single character
-        '%p': r'0x[0-9a-fA-F]+',  # Pointer
-        '%%': r'%'          # Literal %
-    }
-    
     # Replace placeholders with appropriate regex patterns
     result_pattern = escaped_text
     for placeholder, original_spec in placeholder_map.items():
@@ -71,18 +106,27 @@ def convert_to_regex_pattern(text):
         
         # Handle %% special case
         if original_spec == '%%':
-            regex_replacement = format_replacements['%%']
+            regex_replacement = FORMAT_REPLACEMENTS['%%']
         else:
             # Map base specifier to regex pattern
             base_key = f'%{base_spec}'
-            regex_replacement = format_replacements.get(base_key, r'[^\s]*')  # Default to string-like
+            regex_replacement = FORMAT_REPLACEMENTS.get(base_key, r'[^\s]*')  # Default to string-like
         
         escaped_placeholder = re.escape(placeholder)
         result_pattern = result_pattern.replace(escaped_placeholder, regex_replacement)
     
     return result_pattern
 
-def is_format_specifier_match(source, target):
+@lru_cache(maxsize=1024)
+def compile_format_regex(text):
+    """Compile the format specifier regex for text, memoized since each source is matched against many targets.
+    Returns None if the generated pattern does not compile."""
+    try:
+        return re.compile(convert_to_regex_pattern(text), re.IGNORECASE)
+    except re.error:
+        return None
+
+def is_format_specifier_match(source, target, source_norm=None, target_norm=None):
     """
     Check if source (with format specifiers) matches target.
     Returns (is_match, match_type, matched_text, similarity_score).
@@ -90,20 +134,22 @@ def is_format_specifier_match(source, target):
     if not has_format_specifiers(source):
         return False, "no_format_match", "", 0.0
     
-    source_norm = normalize_text(source)
-    target_norm = normalize_text(target)
+    if source_norm is None:
+        source_norm = normalize_text(source)
+    if target_norm is None:
+        target_norm = normalize_text(target)
     
     # Special case: if both source and target have format specifiers,
     # compare them by converting format specifiers to a common pattern
     if has_format_specifiers(target):
         # Convert both to normalized patterns for comparison
-        source_pattern = re.sub(r'%[-#+ 0]*\*?(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlL]?[diouxXeEfFgGaAcspn%]', '%FORMAT%', source_norm)
-        target_pattern = re.sub(r'%[-#+ 0]*\*?(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlL]?[diouxXeEfFgGaAcspn%]', '%FORMAT%', target_norm)
+        source_pattern = FORMAT_SPECIFIER_RE.sub('%FORMAT%', source_norm)
+        target_pattern = FORMAT_SPECIFIER_RE.sub('%FORMAT%', target_norm)
         
         if source_pattern == target_pattern:
             # Calculate similarity based on how many format specifiers match the same positions
-            source_specs = re.findall(r'%[-#+ 0]*\*?(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlL]?[diouxXeEfFgGaAcspn%]', source_norm)
-            target_specs = re.findall(r'%[-#+ 0]*\*?(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlL]?[diouxXeEfFgGaAcspn%]', target_norm)
+            source_specs = FORMAT_SPECIFIER_RE.findall(source_norm)
+            target_specs = FORMAT_SPECIFIER_RE.findall(target_norm)
             
             if len(source_specs) == len(target_specs):
                 # High score for same structure, even with different format specifier types
@@ -111,29 +157,23 @@ def is_format_specifier_match(source, target):
                 return True, "format_specifier_match", source_norm, score
     
     # Original logic: source has format specifiers, target has actual values
-    # Convert source to regex pattern
-    try:
-        pattern = convert_to_regex_pattern(source_norm)
-        regex = re.compile(pattern, re.IGNORECASE)
-        
-        # Check if the entire target matches the pattern
-        if regex.fullmatch(target_norm):
-            # Calculate similarity score based on how much is literal vs format specifiers
-            literal_chars = len(re.sub(r'%[-#+ 0]*\*?(?:\d+|\*)?(?:\.(?:\d+|\*))?[hlL]?[diouxXeEfFgGaAcspn%]', '', source_norm))
-            total_chars = len(source_norm)
-            if total_chars > 0:
-                score = (literal_chars / total_chars) * 100
-                # Bonus for exact length match
-                if len(source_norm.split()) == len(target_norm.split()):
-                    score = min(100.0, score + 20)
-            else:
-                score = 50.0  # Default score for pattern-only matches
-            
-            return True, "format_specifier_match", source_norm, score
+    # Convert source to regex pattern (if regex compilation fails, fall back to no match)
+    regex = compile_format_regex(source_norm)
+    
+    # Check if the entire target matches the pattern
+    if regex is not None and regex.fullmatch(target_norm):
+        # Calculate similarity score based on how much is literal vs format specifiers
+        literal_chars = len(FORMAT_SPECIFIER_RE.sub('', source_norm))
+        total_chars = len(source_norm)
+        if total_chars > 0:
+            score = (literal_chars / total_chars) * 100
+            # Bonus for exact length match
+            if len(source_norm.split()) == len(target_norm.split()):
+                score = min(100.0, score + 20)
+        else:
+            score = 50.0  # Default score for pattern-only matches
         
-    except re.error:
-        # If regex compilation fails, fall back to no match
-        pass
+        return True, "format_specifier_match", source_norm, score
     
     return False, "no_format_match", "", 0.0
 
@@ -165,21 +205,26 @@ def get_word_combinations_limited(text, min_words=4, max_combinations=10):
     
     return combinations
 
-def is_substring_match(source, target, min_words=4):
+def is_substring_match(source, target, min_words=4, source_norm=None, target_norm=None, source_combinations=None):
     """
     Check if source and target have substring matches.
     Returns (is_match, match_type, matched_text, similarity_score).
+
+    Callers comparing one source against many targets can pass the normalized
+    texts and the source word combinations so they are not rebuilt per pair.
     """
-    source_norm = normalize_text(source)
-    target_norm = normalize_text(target)
+    if source_norm is None:
+        source_norm = normalize_text(source)
+    if target_norm is None:
+        target_norm = normalize_text(target)
     
     # First check for format specifier matches
-    is_format_match, format_match_type, format_matched_text, format_score = is_format_specifier_match(source, target)
+    is_format_match, format_match_type, format_matched_text, format_score = is_format_specifier_match(source, target, source_norm, target_norm)
     if is_format_match:
         return True, format_match_type, format_matched_text, format_score
     
     # Also check reverse direction for format specifiers
-    is_reverse_format_match, reverse_format_match_type, reverse_format_matched_text, reverse_format_score = is_format_specifier_match(target, source)
+    is_reverse_format_match, reverse_format_match_type, reverse_format_matched_text, reverse_format_score = is_format_specifier_match(target, source, target_norm, source_norm)
     if is_reverse_format_match:
         return True, "reverse_" + reverse_format_match_type, reverse_format_matched_text, reverse_format_score
     
@@ -190,7 +235,8 @@ def is_substring_match(source, target, min_words=4):
         return True, "target_in_source", target_norm, 100.0
     
     # Check for word combination matches
-    source_combinations = get_word_combinations(source_norm, min_words)
+    if source_combinations is None:
+        source_combinations = get_word_combinations(source_norm, min_words)
     target_combinations = get_word_combinations(target_norm, min_words)
     
     # Check if any source combination appears in target
@@ -209,9 +255,28 @@ def is_substring_match(source, target, min_words=4):
     
     return False, "no_match", "", 0.0
 
-def compare_single_source_line(args):
-    """Compare a single source line against all target lines for substring matches."""
-    source_idx, source_line, target_data, min_words = args
+def match_target_line(source_line, source_norm, source_combinations, target_line, min_words):
+    """Check one target line against a pre-normalized source line, skipping hopeless pairs early."""
+    # Quick length check - if target is much shorter than source, 
+    # it's unlikely to have meaningful matches unless it's a substring
+    target_norm = normalize_text(target_line)
+    
+    # Skip if both strings are very different in length and neither contains the other
+    len_ratio = min(len(source_norm), len(target_norm)) / max(len(source_norm), len(target_norm))
+    if len_ratio < 0.2:  # If one is less than 20% the length of the other
+        # Only check if the shorter one might be contained in the longer one
+        if len(source_norm) > len(target_norm):
+            if target_norm not in source_norm:
+                return False, "no_match", "", 0.0
+        else:
+            if source_norm not in target_norm:
+                return False, "no_match", "", 0.0
+    
+    # Check for substring matches
+    return is_substring_match(source_line, target_line, min_words, source_norm, target_norm, source_combinations)
+
+def compare_source_against_targets(source_idx, source_line, filtered_targets, min_words):
+    """Compare a source line against pre-filtered (target_index, target_line) pairs."""
     matches = []
     
     # Pre-filter by minimum length
@@ -219,39 +284,24 @@ def compare_single_source_line(args):
     if source_words < 3:  # Skip very short sources
         return None
     
-    # Pre-filter target data to avoid checking every line
-    filtered_targets = []
-    for target_idx, target_line in enumerate(target_data):
-        target_words = len(target_line.split())
-        if target_words >= 3:  # Only consider targets with 3+ words
-            filtered_targets.append((target_idx, target_line))
-    
     # Early exit if no valid targets
     if not filtered_targets:
         return None
     
     # For very large target datasets, we can optimize by doing quick checks first
     source_norm = normalize_text(source_line)
+    source_combinations = get_word_combinations(source_norm, min_words)
+    
+    # Duplicate target lines always produce the same result, so score each distinct line once
+    line_results = {}
     
     for target_idx, target_line in filtered_targets:
-        # Quick length check - if target is much shorter than source, 
-        # it's unlikely to have meaningful matches unless it's a substring
-        target_norm = normalize_text(target_line)
-        
-        # Skip if both strings are very different in length and neither contains the other
-        len_ratio = min(len(source_norm), len(target_norm)) / max(len(source_norm), len(target_norm))
-        if len_ratio < 0.2:  # If one is less than 20% the length of the other
-            # Only check if the shorter one might be contained in the longer one
-            if len(source_norm) > len(target_norm):
-                if target_norm not in source_norm:
-                    continue
-            else:
-                if source_norm not in target_norm:
-                    continue
-        
-        # Check for substring matches
-        is_match, match_type, matched_text, score = is_substring_match(source_line, target_line, min_words)
+        result = line_results.get(target_line)
+        if result is None:
+            result = match_target_line(source_line, source_norm, source_combinations, target_line, min_words)
+            line_results[target_line] = result
         
+        is_match, match_type, matched_text, score = result
         if is_match:
             matches.append({
                 "target_index": target_idx,
@@ -274,6 +324,26 @@ def compare_single_source_line(args):
     return None
 
 
+# Per-process state for the parallel path, filled in once by the pool initializer
+_worker_targets = None
+_worker_min_words = None
+
+def init_parallel_worker(target_data, min_words):
+    """Pool initializer: filter the target lines once per worker instead of once per task."""
+    global _worker_targets, _worker_min_words
+    _worker_targets = [(i, line) for i, line in enumerate(target_data) if len(line.split()) >= 3]
+    _worker_min_words = min_words
+
+def compare_source_chunk(chunk):
+    """Compare a chunk of (source_index, source_line) pairs against this worker's target lines."""
+    results = []
+    for source_idx, source_line in chunk:
+        result = compare_source_against_targets(source_idx, source_line, _worker_targets, _worker_min_words)
+        if result:
+            results.append(result)
+    return results
+
+
 def compare_json_lines_parallel(source_data, target_data, min_words=4, max_workers=None):
     """Parallel version of substring comparison using multiprocessing."""
     # For very large datasets, limit workers to avoid memory issues
@@ -293,70 +363,99 @@ def compare_json_lines_parallel(source_data, target_data, min_words=4, max_worke
         print("No source lines with 3+ words found.")
         return []
     
-    # For very large target data, we need to be more memory efficient
-    # Split source data into smaller batches to avoid memory issues
+    # The target lines are handed to each worker once through the pool initializer,
+    # so tasks only carry source lines; chunk them to keep per-task overhead low
     if len(target_data) > 100000:
-        batch_size = 1  # Process one source at a time for huge datasets
+        chunk_size = 1  # Process one source at a time for huge datasets
     else:
-        batch_size = max(1, len(filtered_source) // max_workers)
-        if len(target_data) > 10000:  # If target is large, use smaller batches
-            batch_size = min(batch_size, 10)
+        chunk_size = max(1, len(filtered_source) // (max_workers * 4))
+        if len(target_data) > 10000:  # If target is large, use smaller chunks
+            chunk_size = min(chunk_size, 10)
+    chunks = [filtered_source[start:start + chunk_size]
+              for start in range(0, len(filtered_source), chunk_size)]
     
     matched_lines = []
-    
-    # Process in batches to avoid memory issues
-    for batch_start in range(0, len(filtered_source), batch_size):
-        batch_end = min(batch_start + batch_size, len(filtered_source))
-        batch_source = filtered_source[batch_start:batch_end]
-        
-        print(f"Processing batch {batch_start//batch_size + 1}/{(len(filtered_source) + batch_size - 1)//batch_size} ({len(batch_source)} sources)")
-        
-        # Prepare arguments for this batch
-        args_list = [(i, source_line, target_data, min_words) 
-                     for i, source_line in batch_source]
+    # One progress bar across all chunks instead of a line per completion
+    progress = tqdm(total=len(filtered_source), desc="Comparing lines", unit="line")
+    
+    timeout_seconds = 60 if len(target_data) > 100000 else 30  # Longer timeout for huge datasets
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks)),
+                             initializer=init_parallel_worker,
+                             initargs=(target_data, min_words)) as executor:
+        futures = [executor.submit(compare_source_chunk, chunk) for chunk in chunks]
         
-        with ProcessPoolExecutor(max_workers=min(max_workers, len(args_list))) as executor:
-            # Submit all tasks for this batch
-            futures = [executor.submit(compare_single_source_line, args) for args in args_list]
-            
-            # Collect results with progress bar
-            completed = 0
-            timeout_seconds = 60 if len(target_data) > 100000 else 30  # Longer timeout for huge datasets
-            for future in futures:
-                try:
-                    result = future.result(timeout=timeout_seconds)
-                    if result:  # Only add if there were matches
-                        matched_lines.append(result)
-                    completed += 1
-                    if completed % 1 == 0:  # Show progress for each completion
-                        print(f"  Completed {completed}/{len(futures)} comparisons in this batch")
-                except Exception as e:
-                    print(f"  Warning: Task failed with error: {e}")
-                    completed += 1
+        # Collect results with progress bar
+        for chunk, future in zip(chunks, futures):
+            try:
+                matched_lines.extend(future.result(timeout=timeout_seconds * len(chunk)))
+            except Exception as e:
+                tqdm.write(f"  Warning: Task failed with error: {e}")
+            progress.update(len(chunk))
+    
+    progress.close()
     
     # Sort by source index to maintain order
     matched_lines.sort(key=lambda x: x["source_index"])
     return matched_lines
 
 
+def build_target_word_index(filtered_target):
+    """
+    Index (target_index, target_line, target_norm) entries for candidate blocking.
+    Returns a dict mapping each normalized word to the positions of the targets containing it,
+    and the positions of targets that contain format specifiers.
+    """
+    word_index = {}
+    format_positions = []
+    for pos, (_, target_line, target_norm) in enumerate(filtered_target):
+        for word in set(target_norm.split()):
+            word_index.setdefault(word, []).append(pos)
+        if has_format_specifiers(target_line):
+            format_positions.append(pos)
+    return word_index, format_positions
+
 def compare_json_lines_optimized(source_data, target_data, min_words=4):
     """Optimized single-threaded version for substring matching."""
     matched_lines = []
     print(f"Processing {len(source_data)} source lines against {len(target_data)} target lines...")
     print(f"Minimum word combination length: {min_words}")
     
-    # Pre-filter very short strings
-    filtered_target = [(i, line) for i, line in enumerate(target_data) if len(line.split()) >= 3]
+    # Pre-filter very short strings and normalize the targets once up front
+    filtered_target = [(i, line, normalize_text(line)) for i, line in enumerate(target_data) if len(line.split()) >= 3]
+    
+    # Candidate blocking: with 3+ words on both sides and combinations of 3+ words, every
+    # substring or combination match contains a word that is space-delimited on both sides,
+    # so the lines must share a whole normalized word. Format specifier matches need a
+    # specifier in either line. Anything outside those sets can never match.
+    use_word_index = min_words >= 3
+    if use_word_index:
+        word_index, format_positions = build_target_word_index(filtered_target)
     
     for i, source_line in enumerate(tqdm(source_data, desc="Comparing lines", unit="line")):
         if len(source_line.split()) < 3:
             continue
             
         target_matches = []
+        source_norm = normalize_text(source_line)
+        source_combinations = get_word_combinations(source_norm, min_words)
+        # Duplicate target lines always produce the same result, so score each distinct line once
+        line_results = {}
+        
+        if use_word_index and not has_format_specifiers(source_line):
+            positions = set(format_positions)
+            for word in set(source_norm.split()):
+                positions.update(word_index.get(word, ()))
+            candidate_targets = [filtered_target[pos] for pos in sorted(positions)]
+        else:
+            candidate_targets = filtered_target
         
-        for j, target_line in filtered_target:
+        for j, target_line, target_norm in candidate_targets:
             # Check for substring matches
-            is_match, match_type, matched_text, score = is_substring_match(source_line, target_line, min_words)
+            result = line_results.get(target_line)
+            if result is None:
+                result = is_substring_match(source_line, target_line, min_words, source_norm, target_norm, source_combinations)
+                line_results[target_line] = result
+            is_match, match_type, matched_text, score = result
             
             if is_match:
                 target_matches.append({
@@ -510,10 +609,9 @@ def compare_json_lines_ultra_fast(source_data, target_data, min_words=4, batch_s
         
         # Only add if there were matches
         if target_matches:
-            # Sort matches by similarity score (highest first) and limit results
-            target_matches.sort(key=lambda x: x["similarity_score"], reverse=True)
-            # Limit to top 20 matches to prevent memory issues
-            target_matches = target_matches[:20]
+            # Keep the top 20 matches by similarity score (highest first) to prevent memory issues;
+            # nlargest selects them without sorting the whole list
+            target_matches = heapq.nlargest(20, target_matches, key=lambda x: x["similarity_score"])
             
             matched_lines.append({
                 "source_index": source_idx,
@@ -625,8 +723,7 @@ def process_large_dataset_optimized(filtered_source, filtered_target, min_words)
                             break
             
             if target_matches:
-                target_matches.sort(key=lambda x: x["similarity_score"], reverse=True)
-                target_matches = target_matches[:10]  # Limit for large datasets
+                target_matches = heapq.nlargest(10, target_matches, key=lambda x: x["similarity_score"])  # Limit for large datasets
                 
                 matched_lines.append({
                     "source_index": source_idx,
@@ -638,40 +735,32 @@ def process_large_dataset_optimized(filtered_source, filtered_target, min_words)
     return matched_lines
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Match lines between two JSONL files using substring matching.")
-    parser.add_argument("source", help="Path to the source JSON lines file.")
-    parser.add_argument("target", help="Path to the target JSON lines file.")
-    parser.add_argument("--min-words", type=int, default=4, help="Minimum number of consecutive words for combination matching (default=4).")
-    parser.add_argument("--min-score", type=float, default=0.0, help="Minimum similarity score to include in results (default=0.0).")
-    parser.add_argument("--parallel", action="store_true", help="Use parallel processing for faster comparison.")
-    parser.add_argument("--ultra-fast", action="store_true", help="Use ultra-fast algorithm with advanced optimizations.")
-    parser.add_argument("--workers", type=int, default=None, help="Number of parallel workers (default: auto).")
-    parser.add_argument("--output", "-o", help="Output JSON file to write matches (default: print to console).")
-    parser.add_argument("--pretty", action="store_true", help="Pretty print JSON output with indentation.")
-
-    args = parser.parse_args()
-
-    source_data = load_json_lines(args.source)
-    target_data = load_json_lines(args.target)
+def run(source, target, min_words=4, min_score=0.0, parallel=False, ultra_fast=False, workers=None):
+    """
+    Load the source and target JSON files, match them and return the grouped matches.
+    This is what main() runs after parsing the command line; callers that already have
+    the script imported (such as the test framework) can use it without a new process.
+    """
+    source_data = load_json_lines(source)
+    target_data = load_json_lines(target)
     
     # Warn about large datasets
     if len(target_data) > 100000:
         print(f"⚠️  Warning: Large target dataset detected ({len(target_data)} lines)")
-        if args.parallel:
+        if parallel:
             print("   Parallel processing may be slow with very large datasets.")
             print("   Consider using --ultra-fast for better performance.")
         print()
 
-    if args.ultra_fast:
-        matches = compare_json_lines_ultra_fast(source_data, target_data, args.min_words)
-    elif args.parallel:
-        matches = compare_json_lines_parallel(source_data, target_data, args.min_words, args.workers)
+    if ultra_fast:
+        matches = compare_json_lines_ultra_fast(source_data, target_data, min_words)
+    elif parallel:
+        matches = compare_json_lines_parallel(source_data, target_data, min_words, workers)
     else:
-        matches = compare_json_lines_optimized(source_data, target_data, args.min_words)
+        matches = compare_json_lines_optimized(source_data, target_data, min_words)
     
     # Filter matches by minimum similarity score
-    if args.min_score > 0.0:
+    if min_score > 0.0:
         original_count = len(matches)
         filtered_matches = []
         total_filtered_targets = 0
@@ -680,7 +769,7 @@ def main():
             # Filter target matches by score
             filtered_target_matches = [
                 target_match for target_match in match["target_matches"] 
-                if target_match["similarity_score"] >= args.min_score
+                if target_match["similarity_score"] >= min_score
             ]
             
             # Only include source match if it has qualifying target matches
@@ -692,11 +781,11 @@ def main():
                 total_filtered_targets += len(filtered_target_matches)
         
         matches = filtered_matches
-        print(f"Filtered {original_count - len(matches)} source matches below score threshold {args.min_score}")
+        print(f"Filtered {original_count - len(matches)} source matches below score threshold {min_score}")
     
-    print(f"\nFound substring matches for {len(matches)} source lines (min words: {args.min_words}", end="")
-    if args.min_score > 0.0:
-        print(f", min score: {args.min_score})", end="")
+    print(f"\nFound substring matches for {len(matches)} source lines (min words: {min_words}", end="")
+    if min_score > 0.0:
+        print(f", min score: {min_score})", end="")
     else:
         print(")", end="")
     print()  # New line
@@ -705,14 +794,51 @@ def main():
     total_matches = sum(match["match_count"] for match in matches)
     print(f"Total target matches: {total_matches}")
     
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match lines between two JSONL files using substring matching.")
+    parser.add_argument("source", help="Path to the source JSON lines file.")
+    parser.add_argument("target", help="Path to the target JSON lines file.")
+    parser.add_argument("--min-words", type=int, default=4, help="Minimum number of consecutive words for combination matching (default=4).")
+    parser.add_argument("--min-score", type=float, default=0.0, help="Minimum similarity score to include in results (default=0.0).")
+    parser.add_argument("--parallel", action="store_true", help="Use parallel processing for faster comparison.")
+    parser.add_argument("--ultra-fast", action="store_true", help="Use ultra-fast algorithm with advanced optimizations.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of parallel workers (default: auto).")
+    parser.add_argument("--output", "-o", help="Output JSON file to write matches, or '-' for the JSON document on stdout (default: print to console).")
+    parser.add_argument("--pretty", action="store_true", help="Pretty print JSON output with indentation.")
+
+    args = parser.parse_args()
+
+    if args.output == "-":
+        # stdout carries only the JSON document, so send the progress and summary lines to stderr
+        with redirect_stdout(sys.stderr):
+            matches = run(args.source, args.target, args.min_words, args.min_score,
+                          parallel=args.parallel, ultra_fast=args.ultra_fast, workers=args.workers)
+        if orjson is not None:
+            data = orjson.dumps(matches, option=orjson.OPT_INDENT_2 if args.pretty else 0)
+        else:
+            data = json.dumps(matches, indent=2 if args.pretty else None, ensure_ascii=False).encode('utf-8')
+        sys.stdout.buffer.write(data + b"\n")
+        sys.stdout.flush()
+        return
+    
+    matches = run(args.source, args.target, args.min_words, args.min_score,
+                  parallel=args.parallel, ultra_fast=args.ultra_fast, workers=args.workers)
+    
     if args.output:
         # Write to JSON file
         try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                if args.pretty:
-                    json.dump(matches, f, indent=2, ensure_ascii=False)
-                else:
-                    json.dump(matches, f, ensure_ascii=False)
+            if orjson is not None:
+                with open(args.output, 'wb') as f:
+                    f.write(orjson.dumps(matches, option=orjson.OPT_INDENT_2 if args.pretty else 0))
+            else:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    if args.pretty:
+                        json.dump(matches, f, indent=2, ensure_ascii=False)
+                    else:
+                        json.dump(matches, f, ensure_ascii=False)
             print(f"✅ Results written to: {args.output}")
         except Exception as e:
             print(f"❌ Error writing to file {args.output}: {e}")
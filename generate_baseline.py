@@ -4,13 +4,26 @@ import sys
 import json
 import ast
 import argparse
+from collections import deque
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import multiprocessing
 from tqdm import tqdm
 
+try:
+    import orjson
+except ImportError:  # Optional dependency; fall back to the stdlib json module
+    orjson = None
+
 CODE_EXTENSIONS = {'.py', '.js', '.ts', '.java', '.c', '.h', '.cpp', '.go', '.rb', '.rs'}
 
+# Directories that never contain source to scan; pruned during the walk
+EXCLUDED_DIRS = frozenset({'.git', '.hg', '.svn'})
+
+# Background file reads kept in flight while the main thread runs the extraction
+READ_AHEAD_WORKERS = 8
+READ_AHEAD_FILES = 64
+
 STRING_AND_COMMENT_PATTERNS = {
     'py': [r'(?P<str>["\']{1,3}.*?["\']{1,3})', r'#.*?$'],
     'js': [r'(["\'])(?:(?=(\\?))\2.)*?\1', r'//.*?$|/\*[\s\S]*?\*/'],
@@ -490,7 +503,7 @@ def combine_function_call_strings(text, matches, match_info, verbose=False):
     
     return combined_strings, strings_to_exclude
 
-def extract_strings_and_comments(filepath, verbose=False):
+def extract_strings_and_comments(filepath, verbose=False, text=None):
     ext = filepath.suffix[1:]
     patterns = STRING_AND_COMMENT_PATTERNS.get(ext)
     if not patterns:
@@ -499,11 +512,12 @@ def extract_strings_and_comments(filepath, verbose=False):
     if verbose:
         print(f"  📁 Processing file: {filepath}")
 
-    try:
-        text = filepath.read_text(encoding='utf-8', errors='ignore')
-    except Exception as e:
-        print(f"Error reading {filepath}: {e}")
-        return []
+    if text is None:
+        try:
+            text = filepath.read_text(encoding='utf-8', errors='ignore')
+        except Exception as e:
+            print(f"Error reading {filepath}: {e}")
+            return []
 
     matches = []
     match_info = []  # Store (line_number, cleaned_string) for verbose output
@@ -573,6 +587,43 @@ def extract_strings_and_comments(filepath, verbose=False):
 
     return filtered_matches
 
+def iter_code_files(repo_path):
+    """Yield the code files under repo_path, skipping excluded directories."""
+    for dirpath, dirnames, filenames in os.walk(repo_path, topdown=True):
+        # Prune excluded directories in place so os.walk never descends into them
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        for filename in filenames:
+            if os.path.splitext(filename)[1] in CODE_EXTENSIONS:
+                yield Path(dirpath, filename)
+
+def _read_source_text(filepath):
+    """Read a source file for prefetching; returns None if it can't be read."""
+    try:
+        return filepath.read_text(encoding='utf-8', errors='ignore')
+    except Exception:
+        return None
+
+def iter_source_texts(paths):
+    """
+    Yield (path, text) pairs in input order while reading ahead on a thread pool.
+    File reads release the GIL, so they overlap with the extraction done by the caller.
+    The text is None for files with no extraction patterns or that failed to read;
+    extract_strings_and_comments() then handles (and reports) them itself.
+    """
+    with ThreadPoolExecutor(max_workers=READ_AHEAD_WORKERS) as executor:
+        pending = deque()
+        for path in paths:
+            if path.suffix[1:] in STRING_AND_COMMENT_PATTERNS:
+                pending.append((path, executor.submit(_read_source_text, path)))
+            else:
+                pending.append((path, None))
+            if len(pending) >= READ_AHEAD_FILES:
+                path, future = pending.popleft()
+                yield path, future.result() if future else None
+        while pending:
+            path, future = pending.popleft()
+            yield path, future.result() if future else None
+
 def extract_repo_strings(repo_path, verbose=False):
     all_strings = set()
     files_processed = 0
@@ -596,11 +647,10 @@ def extract_repo_strings(repo_path, verbose=False):
     
     # Handle directory input
     elif repo_path.is_dir():
-        for path in repo_path.rglob('*'):
-            if path.suffix in CODE_EXTENSIONS:
-                files_processed += 1
-                strings = extract_strings_and_comments(path, verbose)
-                all_strings.update(strings)
+        for path, text in iter_source_texts(iter_code_files(repo_path)):
+            files_processed += 1
+            strings = extract_strings_and_comments(path, verbose, text)
+            all_strings.update(strings)
     
     if verbose:
         if repo_path.is_file():
@@ -610,7 +660,57 @@ def extract_repo_strings(repo_path, verbose=False):
     
     return sorted(all_strings)
 
-if __name__ == "__main__":
+def encode_json_string(s):
+    """Encode a single string as UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(s)
+    return json.dumps(s, ensure_ascii=False).encode('utf-8')
+
+def write_baseline(baseline_file, strings):
+    """
+    Write strings as a JSON array laid out like json.dump(indent=2).
+    Entries are encoded one at a time so the whole document is never built in memory.
+    """
+    with open(baseline_file, 'wb') as f:
+        if not strings:
+            f.write(b'[]')
+            return
+        f.write(b'[\n  ')
+        for i, s in enumerate(strings):
+            if i:
+                f.write(b',\n  ')
+            f.write(encode_json_string(s))
+        f.write(b'\n]')
+
+def generate(repo_path, baseline_file=None, verbose=False):
+    """
+    Extract the strings/comments baseline for a repository directory or single code file.
+    Writes it to baseline_file when one is given and returns the sorted list of strings.
+    This is what main() runs after parsing the command line; callers that already have the
+    script imported (such as the test framework) can use it without a new process.
+    """
+    repo_path = Path(repo_path)
+
+    if not repo_path.exists():
+        raise FileNotFoundError(f"Path does not exist: {repo_path}")
+
+    if repo_path.is_file():
+        print(f"🔍 Extracting strings/comments from file: {repo_path}")
+    else:
+        print(f"🔍 Extracting strings/comments from directory: {repo_path}")
+    
+    if verbose:
+        print("🔧 Verbose mode enabled - showing detailed processing information")
+    
+    extracted_strings = extract_repo_strings(repo_path, verbose)
+
+    if baseline_file is not None:
+        write_baseline(baseline_file, extracted_strings)
+        print(f"✅ Baseline saved with {len(extracted_strings)} unique cleaned entries in: {baseline_file}")
+
+    return extracted_strings
+
+def main():
     parser = argparse.ArgumentParser(
         description="Extract strings and comments from code files to create a baseline",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -632,26 +732,12 @@ Examples:
                        help="Enable verbose output showing files processed and extracted strings")
     
     args = parser.parse_args()
-    
-    repo_path = Path(args.repo_path)
-    baseline_file = args.baseline_file
-    verbose = args.verbose
 
-    if not repo_path.exists():
-        print(f"❌ Error: Path does not exist: {repo_path}")
+    try:
+        generate(args.repo_path, args.baseline_file, args.verbose)
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
         sys.exit(1)
 
-    if repo_path.is_file():
-        print(f"🔍 Extracting strings/comments from file: {repo_path}")
-    else:
-        print(f"🔍 Extracting strings/comments from directory: {repo_path}")
-    
-    if verbose:
-        print("🔧 Verbose mode enabled - showing detailed processing information")
-    
-    extracted_strings = extract_repo_strings(repo_path, verbose)
-
-    with open(baseline_file, 'w', encoding='utf-8') as f:
-        json.dump(extracted_strings, f, indent=2, ensure_ascii=False)
-
-    print(f"✅ Baseline saved with {len(extracted_strings)} unique cleaned entries in: {baseline_file}")
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,9 @@ import subprocess
 from pathlib import Path
 from typing import List, Tuple
 
+# Project root, resolved once from this file's location rather than the working directory
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
 class TestSuite:
     def __init__(self, name: str, script_path: str, description: str):
         self.name = name
@@ -29,12 +32,7 @@ class TestSuite:
 
 class MasterTestRunner:
     def __init__(self):
-        # Determine the working directory (project root)
-        current_dir = Path.cwd()
-        if current_dir.name == "tests":
-            self.project_root = current_dir.parent
-        else:
-            self.project_root = current_dir
+        self.project_root = _PROJECT_ROOT
         
         # Define test suites
         self.test_suites = [
@@ -70,6 +68,10 @@ class MasterTestRunner:
         # Add suite-specific arguments
         if suite.name == "similarity" and args.min_words:
             cmd.extend(["--min-words", str(args.min_words)])
+        if args.jobs:
+            cmd.extend(["--jobs", str(args.jobs)])
+        if suite.name == "similarity" and args.force:
+            cmd.append("--force")
         
         try:
             # Run the test suite
@@ -176,6 +178,10 @@ Examples:
     # Similarity-specific options
     parser.add_argument("--min-words", type=int, default=4,
                        help="Minimum word combination length for similarity tests (default: 4)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                       help="Number of tests to run concurrently in each suite (default: CPU count for --subprocess runs, otherwise sequential)")
+    parser.add_argument("--force", action="store_true",
+                       help="Re-run similarity tests that passed unchanged last time")
     
     args = parser.parse_args()
     
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Warm runner for the test frameworks.
+
+This script imports the scripts under test once and then serves requests read as
+JSON lines on stdin, writing one JSON line per response on stdout. The test
+frameworks start it once per session (--daemon), through RunnerDaemonClient, so each
+test costs one pipe round trip instead of a new Python process that re-imports the script.
+
+Request:   {"command": "similarity", "source": "...", "target": "...", "min_words": 4, "min_score": 0.0}
+           {"command": "baseline", "path": "...", "verbose": false}
+Response:  {"ok": true, "result": [...]}  or  {"ok": false, "error": "..."}
+
+Usage:
+    python3 runner_daemon.py
+    python3 runner_daemon.py --similarity-script /path/to/compare_json_similarity_fast.py
+    python3 runner_daemon.py --baseline-script /path/to/generate_baseline.py
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import importlib.util
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; fall back to the stdlib json module
+    orjson = None
+
+# Project root, resolved once from this file's location rather than the working directory
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def load_script(script_path: Path):
+    """Import a script by path as a module."""
+    spec = importlib.util.spec_from_file_location(script_path.stem, script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class RunnerDaemon:
+    def __init__(self, similarity_script: Path, baseline_script: Path):
+        self.similarity_script = similarity_script
+        self.baseline_script = baseline_script
+        self._modules = {}  # Scripts imported so far, by path
+
+    def module(self, script_path: Path):
+        """Import a script on first use and keep it for the rest of the session."""
+        module = self._modules.get(script_path)
+        if module is None:
+            module = self._modules[script_path] = load_script(script_path)
+        return module
+
+    def run_similarity(self, request: dict):
+        """Run compare_json_similarity_fast.run() for a similarity request."""
+        module = self.module(self.similarity_script)
+        return module.run(request["source"], request["target"],
+                          request.get("min_words", 4), request.get("min_score") or 0.0)
+
+    def run_baseline(self, request: dict):
+        """Run generate_baseline.generate() for a baseline request."""
+        module = self.module(self.baseline_script)
+        return module.generate(request["path"], verbose=request.get("verbose", False))
+
+    def dispatch(self, request: dict) -> dict:
+        """Handle one request and build its response."""
+        handlers = {
+            "similarity": self.run_similarity,
+            "baseline": self.run_baseline,
+        }
+        handler = handlers.get(request.get("command"))
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {request.get('command')}"}
+
+        try:
+            # stdout carries the responses, so keep the scripts' own output off it
+            with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+                result = handler(request)
+            return {"ok": True, "result": result}
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def serve(self, stdin=None, stdout=None) -> None:
+        """Answer requests until stdin is closed."""
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                response = self.dispatch(json.loads(line))
+            except json.JSONDecodeError as e:
+                response = {"ok": False, "error": f"Invalid request: {e}"}
+            stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+            stdout.flush()
+
+class RunnerDaemonClient:
+    """Test-framework side of the protocol: one runner_daemon.py process, started on first request."""
+    
+    def __init__(self, daemon_args: List[str]):
+        self.daemon_args = daemon_args  # Command-line options for the daemon, e.g. its script paths
+        self._process: Optional[subprocess.Popen] = None
+    
+    def start(self) -> None:
+        """Start the daemon if it isn't running."""
+        if self._process is None:
+            self._process = subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), *self.daemon_args],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                close_fds=os.name != "posix"
+            )
+    
+    def request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one request and return the daemon's response. Raises RuntimeError or OSError if the daemon
+        died; it is then stopped, so the next request starts a new one.
+        """
+        self.start()
+        try:
+            self._process.stdin.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b"\n")
+            self._process.stdin.flush()
+            line = self._process.stdout.readline()
+        except OSError:
+            self.close()
+            raise
+        if not line:
+            self.close()
+            raise RuntimeError("Runner daemon exited unexpectedly")
+        return orjson.loads(line) if orjson is not None else json.loads(line)
+    
+    def close(self) -> None:
+        """Stop the daemon, if it is running."""
+        if self._process is not None:
+            process, self._process = self._process, None
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            process.wait()
+            process.stdout.close()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Warm runner serving test requests as JSON lines on stdin/stdout"
+    )
+    parser.add_argument("--similarity-script", default=str(_PROJECT_ROOT / "compare_json_similarity_fast.py"),
+                       help="Path to compare_json_similarity_fast.py script (default: project copy)")
+    parser.add_argument("--baseline-script", default=str(_PROJECT_ROOT / "generate_baseline.py"),
+                       help="Path to generate_baseline.py script (default: project copy)")
+
+    args = parser.parse_args()
+
+    # Responses are UTF-8 JSON lines whatever the locale
+    sys.stdin.reconfigure(encoding='utf-8')
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    RunnerDaemon(Path(args.similarity_script), Path(args.baseline_script)).serve()
+
+if __name__ == "__main__":
+    main()
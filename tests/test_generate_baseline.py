@@ -10,18 +10,64 @@ Usage:
     python3 test_generate_baseline.py --verbose    # Run with detailed output
     python3 test_generate_baseline.py --update     # Update expected results
     python3 test_generate_baseline.py --test testMultineErrMsg  # Run specific test
+    python3 test_generate_baseline.py --daemon     # Run tests in one warm runner process
 """
 
 import os
 import sys
 import json
-import argparse
-import subprocess
-import tempfile
+import heapq
+import mmap
+import importlib.util
+from collections import Counter
+from functools import partial
+from itertools import chain
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Any
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; fall back to the stdlib json module
+    orjson = None
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes with orjson when available (its decode error subclasses json.JSONDecodeError)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_load_file(path: Path, size: int) -> Any:
+    """
+    Parse a JSON file of the given size. With orjson the file is mapped into memory and
+    parsed in place instead of being copied into a bytes object first.
+    """
+    if orjson is None or size == 0:
+        # mmap cannot map an empty file; an empty document still fails as invalid JSON
+        return _json_loads(path.read_bytes())
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+# Parsed expected outputs for this session, keyed by file with the mtime they were read at
+_EXPECTED_OUTPUTS: Dict[Path, Tuple[int, List[str]]] = {}
+
+# Baseline scripts imported in this process, by path
+_BASELINE_MODULES: Dict[Path, Any] = {}
+
+# Extensions of the source files used as baseline test inputs
+_EXT_TUPLE = ('.c', '.h', '.cpp', '.py', '.js', '.ts', '.java', '.go', '.rb', '.rs')
+
+# Number of buffered status lines written per batch in non-verbose runs
+_STATUS_BATCH_LINES = 32
+
+# Project root, resolved once from this file's location rather than the working directory
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 class TestResult:
+    __test__ = False  # Not a pytest test class
+    
     def __init__(self, name: str, passed: bool, message: str = "", expected_count: int = 0, actual_count: int = 0):
         self.name = name
         self.passed = passed
@@ -30,27 +76,23 @@ class TestResult:
         self.actual_count = actual_count
 
 class BaselineTestFramework:
-    def __init__(self, test_dir: str = "testData/generate_baseline", baseline_script: str = "generate_baseline.py"):
-        # Determine the working directory (project root)
-        # If we're in the tests directory, go up one level
-        current_dir = Path.cwd()
-        if current_dir.name == "tests":
-            project_root = current_dir.parent
-        else:
-            project_root = current_dir
-            
+    def __init__(self, test_dir: str = "testData/generate_baseline", baseline_script: str = "generate_baseline.py", use_subprocess: bool = False, use_daemon: bool = False):
         self.test_dir = Path(test_dir)
         # If test_dir is relative, make it relative to project root
         if not self.test_dir.is_absolute():
-            self.test_dir = project_root / self.test_dir
+            self.test_dir = _PROJECT_ROOT / self.test_dir
             
         self.baseline_script = Path(baseline_script)
         # If baseline_script is relative, make it relative to project root
         if not self.baseline_script.is_absolute():
-            self.baseline_script = project_root / self.baseline_script
+            self.baseline_script = _PROJECT_ROOT / self.baseline_script
             
-        self.project_root = project_root
+        self.use_subprocess = use_subprocess
+        self.use_daemon = use_daemon
+        self._tmpdir = None  # Subprocess output directory, created on first subprocess run
+        self._daemon = None  # RunnerDaemonClient for runner_daemon.py, created on first daemon run
         self.test_results: List[TestResult] = []
+        self._failure_count = 0  # Failed results in test_results, counted as they are collected
         
         # Ensure test directory exists
         self.test_dir.mkdir(exist_ok=True)
@@ -58,60 +100,132 @@ class BaselineTestFramework:
         if not self.baseline_script.exists():
             raise FileNotFoundError(f"Baseline script not found: {self.baseline_script}")
     
+    def __getstate__(self):
+        """Pickle for worker processes without the output directory, daemon or collected results."""
+        state = self.__dict__.copy()
+        state['_tmpdir'] = None  # Workers create their own output directory
+        state['_daemon'] = None
+        state['test_results'] = []
+        state['_failure_count'] = 0
+        return state
+    
     def discover_test_files(self) -> List[Path]:
         """Discover all test files in the test directory."""
-        test_files = []
-        for ext in ['.c', '.h', '.cpp', '.py', '.js', '.ts', '.java', '.go', '.rb', '.rs']:
-            test_files.extend(self.test_dir.glob(f"*{ext}"))
-        
-        # Filter out expected output files
-        test_files = [f for f in test_files if not f.name.endswith('_output.json')]
-        return sorted(test_files)
+        # One directory listing instead of a glob per extension, matching the same entries as
+        # glob("*.ext") did; expected output files (*_output.json) need no check of their own
+        # since .json is not in _EXT_TUPLE.
+        with os.scandir(self.test_dir) as entries:
+            return sorted(Path(entry.path) for entry in entries if entry.name.endswith(_EXT_TUPLE))
     
     def get_expected_output_file(self, test_file: Path) -> Path:
         """Get the expected output file path for a test file."""
         return self.test_dir / f"{test_file.stem}_output.json"
     
+    def load_baseline_module(self):
+        """
+        Import the baseline script once per process so tests can call its generate() without a
+        new process. The module is cached at module level, so worker processes import it once too.
+        """
+        module = _BASELINE_MODULES.get(self.baseline_script)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(self.baseline_script.stem, self.baseline_script)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _BASELINE_MODULES[self.baseline_script] = module
+        return module
+    
     def run_baseline_script(self, test_file: Path, verbose: bool = False) -> Tuple[bool, str, Optional[List[str]]]:
         """Run generate_baseline.py on a test file and return the result."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_output:
-            temp_output_path = temp_output.name
+        if self.use_subprocess:
+            return self.run_baseline_subprocess(test_file, verbose)
+        if self.use_daemon:
+            return self.run_baseline_daemon(test_file, verbose)
         
         try:
-            cmd = [sys.executable, str(self.baseline_script), str(test_file), temp_output_path]
-            if verbose:
-                cmd.append('--verbose')
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=self.project_root)
-            
-            if result.returncode != 0:
-                return False, f"Script failed with error: {result.stderr}", None
-            
-            # Read the generated output
-            try:
-                with open(temp_output_path, 'r', encoding='utf-8') as f:
-                    output_data = json.load(f)
-                return True, "", output_data
-            except json.JSONDecodeError as e:
-                return False, f"Invalid JSON output: {e}", None
-            except Exception as e:
-                return False, f"Error reading output: {e}", None
+            module = self.load_baseline_module()
+            # Keep the script's progress output out of the test output, as the subprocess run did
+            with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+                output_data = module.generate(str(test_file), verbose=verbose)
+            return True, "", output_data
+        except Exception as e:
+            return False, f"Script failed with error: {e}", None
+    
+    def run_baseline_daemon(self, test_file: Path, verbose: bool = False) -> Tuple[bool, str, Optional[List[str]]]:
+        """Send the test file to the warm runner daemon (started on first use) and return the result."""
+        try:
+            if self._daemon is None:
+                from runner_daemon import RunnerDaemonClient  # Only needed for --daemon runs
+                
+                self._daemon = RunnerDaemonClient(["--baseline-script", str(self.baseline_script)])
+            response = self._daemon.request({"command": "baseline", "path": str(test_file), "verbose": verbose})
+            if not response["ok"]:
+                return False, f"Script failed with error: {response['error']}", None
+            return True, "", response["result"]
+        except Exception as e:
+            return False, f"Error running script: {e}", None
+    
+    def run_baseline_subprocess(self, test_file: Path, verbose: bool = False) -> Tuple[bool, str, Optional[List[str]]]:
+        """Run generate_baseline.py on a test file in a separate Python process and return the result."""
+        import subprocess  # Only needed for --daemon and --subprocess runs
+        import tempfile
         
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(temp_output_path)
-            except:
-                pass
+        # One output file per test in a directory kept for the whole run, instead of a
+        # temporary file created and unlinked for every test
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="test_generate_baseline_")
+        temp_output_path = os.path.join(self._tmpdir.name, f"{test_file.name}.json")
+        
+        cmd = [sys.executable, str(self.baseline_script), str(test_file), temp_output_path]
+        if verbose:
+            cmd.append('--verbose')
+        
+        try:
+            # Script, test file and output paths are all absolute, so no cwd is needed; together with
+            # close_fds=False (fds are non-inheritable by default since PEP 446) this lets subprocess
+            # use posix_spawn instead of fork/exec on POSIX. The output goes to a file, so stdout only
+            # carries progress messages; stderr shares its pipe and both are reported on failure.
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                    close_fds=os.name != "posix")
+        except Exception as e:
+            return False, f"Error running script: {e}", None
+        
+        if result.returncode != 0:
+            return False, f"Script failed with error: {result.stdout}", None
+        
+        # Read the generated output
+        try:
+            output_data = _json_loads(Path(temp_output_path).read_bytes())
+            return True, "", output_data
+        except json.JSONDecodeError as e:
+            return False, f"Invalid JSON output: {e}", None
+        except Exception as e:
+            return False, f"Error reading output: {e}", None
+    
+    def close(self) -> None:
+        """Remove the subprocess output directory and stop the runner daemon, if they were started."""
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+        if self._daemon is not None:
+            self._daemon.close()
     
     def load_expected_output(self, expected_file: Path) -> Tuple[bool, str, Optional[List[str]]]:
-        """Load the expected output from a file."""
-        if not expected_file.exists():
+        """Load the expected output from a file, reusing the parsed list until the file changes."""
+        try:
+            stat = expected_file.stat()
+        except FileNotFoundError:
             return False, f"Expected output file not found: {expected_file}", None
+        except OSError as e:
+            return False, f"Error reading expected file: {e}", None
+        
+        mtime_ns = stat.st_mtime_ns
+        cached = _EXPECTED_OUTPUTS.get(expected_file)
+        if cached is not None and cached[0] == mtime_ns:
+            return True, "", cached[1]
         
         try:
-            with open(expected_file, 'r', encoding='utf-8') as f:
-                expected_data = json.load(f)
+            expected_data = _json_load_file(expected_file, stat.st_size)
+            _EXPECTED_OUTPUTS[expected_file] = (mtime_ns, expected_data)
             return True, "", expected_data
         except json.JSONDecodeError as e:
             return False, f"Invalid JSON in expected file: {e}", None
@@ -119,11 +233,9 @@ class BaselineTestFramework:
             return False, f"Error reading expected file: {e}", None
     
     def compare_outputs(self, expected: List[str], actual: List[str], test_name: str) -> TestResult:
-        """Compare expected and actual outputs."""
-        expected_set = set(expected)
-        actual_set = set(actual)
-        
-        if expected_set == actual_set:
+        """Compare expected and actual outputs as multisets of strings."""
+        # Identical lists (the usual passing case) are equal multisets; skip building the Counters
+        if expected == actual:
             return TestResult(
                 test_name, 
                 True, 
@@ -132,21 +244,43 @@ class BaselineTestFramework:
                 len(actual)
             )
         
-        # Detailed comparison
-        missing_strings = expected_set - actual_set
-        extra_strings = actual_set - expected_set
+        expected_counts = Counter(expected)
+        actual_counts = Counter(actual)
+        expected_total = len(expected)
+        
+        if expected_counts == actual_counts:
+            return TestResult(
+                test_name, 
+                True, 
+                f"✅ PASS: Outputs match ({len(actual)} strings)",
+                expected_total,
+                len(actual)
+            )
+        
+        # Detailed comparison in one subtract pass: positive counts are missing strings, negative ones extra
+        difference = expected_counts.copy()
+        difference.subtract(actual_counts)
+        missing_strings = Counter()
+        extra_strings = Counter()
+        for s, n in difference.items():
+            if n > 0:
+                missing_strings[s] = n
+            elif n < 0:
+                extra_strings[s] = -n
         
         error_details = []
         if missing_strings:
-            error_details.append(f"Missing {len(missing_strings)} expected strings:")
-            for s in sorted(list(missing_strings)[:3]):  # Show first 3
+            missing_total = sum(missing_strings.values())
+            error_details.append(f"Missing {missing_total} expected strings:")
+            for s in heapq.nsmallest(3, missing_strings):  # Show the 3 smallest
                 error_details.append(f"  - {s[:80]}{'...' if len(s) > 80 else ''}")
             if len(missing_strings) > 3:
                 error_details.append(f"  ... and {len(missing_strings) - 3} more")
         
         if extra_strings:
-            error_details.append(f"Found {len(extra_strings)} unexpected strings:")
-            for s in sorted(list(extra_strings)[:3]):  # Show first 3
+            extra_total = sum(extra_strings.values())
+            error_details.append(f"Found {extra_total} unexpected strings:")
+            for s in heapq.nsmallest(3, extra_strings):  # Show the 3 smallest
                 error_details.append(f"  + {s[:80]}{'...' if len(s) > 80 else ''}")
             if len(extra_strings) > 3:
                 error_details.append(f"  ... and {len(extra_strings) - 3} more")
@@ -154,8 +288,8 @@ class BaselineTestFramework:
         return TestResult(
             test_name,
             False,
-            f"❌ FAIL: Outputs differ (expected {len(expected)}, got {len(actual)})\n" + "\n".join(error_details),
-            len(expected),
+            f"❌ FAIL: Outputs differ (expected {expected_total}, got {len(actual)})\n" + "\n".join(error_details),
+            expected_total,
             len(actual)
         )
     
@@ -163,8 +297,8 @@ class BaselineTestFramework:
         """Update the expected output file for a test."""
         expected_file = self.get_expected_output_file(test_file)
         try:
-            with open(expected_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            # Written by the script's own fixture writer, so updated files match its output format
+            self.load_baseline_module().write_baseline(expected_file, output_data)
             return True
         except Exception as e:
             print(f"Error updating expected output for {test_file.name}: {e}")
@@ -197,8 +331,18 @@ class BaselineTestFramework:
         
         return self.compare_outputs(expected_output, actual_output, test_name)
     
-    def run_all_tests(self, verbose: bool = False, update_expected: bool = False, specific_test: Optional[str] = None) -> None:
-        """Run all tests or a specific test."""
+    def run_test_shard(self, test_files: List[Path], verbose: bool = False, update_expected: bool = False) -> List[TestResult]:
+        """Run a list of test files in order; the unit of work handed to each worker process."""
+        return [self.run_single_test(test_file, verbose, update_expected) for test_file in test_files]
+    
+    def run_all_tests(self, verbose: bool = False, update_expected: bool = False, specific_test: Optional[str] = None, jobs: Optional[int] = None) -> None:
+        """
+        Run all tests or a specific test.
+        In-process tests take milliseconds, so they run sequentially unless `jobs` is given; --subprocess
+        runs default to one worker per CPU. Test files are split into one shard per worker process and
+        results are still reported in test order. Verbose runs print as they go and daemon runs share
+        one warm process, so both stay sequential.
+        """
         test_files = self.discover_test_files()
         
         if specific_test:
@@ -212,53 +356,109 @@ class BaselineTestFramework:
             print("❌ No test files found in test directory")
             return
         
-        print(f"🔍 Found {len(test_files)} test file(s)")
-        sys.stdout.flush()
+        # Status lines are buffered and written in batches rather than flushed one by one
+        status_lines = [f"🔍 Found {len(test_files)} test file(s)"]
         if update_expected:
-            print("📝 Update mode: Will update expected outputs")
-            sys.stdout.flush()
+            status_lines.append("📝 Update mode: Will update expected outputs")
+        self._write_lines(status_lines)
         
-        for test_file in test_files:
-            result = self.run_single_test(test_file, verbose, update_expected)
-            self.test_results.append(result)
-            
-            if not verbose:
-                # Show concise output
-                status = "✅" if result.passed else "❌"
-                print(f"{status} {result.name} ({result.actual_count} strings)")
-                sys.stdout.flush()
+        if verbose or self.use_daemon or not (jobs or self.use_subprocess):
+            # A worker pool costs more to start than an in-process run of the whole suite
+            workers = 1
+        else:
+            workers = max(1, min(jobs or os.cpu_count() or 1, len(test_files)))
+        if workers > 1:
+            # Imported here so sequential runs skip loading multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            executor = None
+        try:
+            if executor:
+                # Test files share no state, so each worker process runs one contiguous shard of them,
+                # paying its start-up and script import once; map keeps the shards in order
+                shard_size = -(-len(test_files) // workers)
+                shards = [test_files[i:i + shard_size] for i in range(0, len(test_files), shard_size)]
+                run_shard = partial(self.run_test_shard, verbose=verbose, update_expected=update_expected)
+                results = chain.from_iterable(executor.map(run_shard, shards))
             else:
-                print(f"\n{result.message}")
-                sys.stdout.flush()
+                results = (self.run_single_test(test_file, verbose, update_expected) for test_file in test_files)
+            for result in results:
+                self.test_results.append(result)
+                if not result.passed:
+                    self._failure_count += 1
+                
+                if not verbose:
+                    # Show concise output
+                    status = "✅" if result.passed else "❌"
+                    status_lines.append(f"{status} {result.name} ({result.actual_count} strings)")
+                    if len(status_lines) >= _STATUS_BATCH_LINES:
+                        self._write_lines(status_lines)
+                else:
+                    # Verbose runs print while testing, so write each result straight after its test
+                    status_lines.append(f"\n{result.message}")
+                    self._write_lines(status_lines)
+            self._write_lines(status_lines)
+        finally:
+            if executor:
+                executor.shutdown()
     
     def print_summary(self) -> None:
         """Print a summary of all test results."""
         if not self.test_results:
             return
         
-        passed = sum(1 for r in self.test_results if r.passed)
         total = len(self.test_results)
+        passed = total - self._failure_count
         
-        print(f"\n{'='*60}")
-        print(f"📊 TEST SUMMARY: {passed}/{total} tests passed")
-        sys.stdout.flush()
+        # Build the whole report and write it at once
+        report = StringIO()
+        report.write(f"\n{'='*60}\n")
+        report.write(f"📊 TEST SUMMARY: {passed}/{total} tests passed\n")
         
         if passed == total:
-            print("🎉 All tests passed!")
+            report.write("🎉 All tests passed!\n")
         else:
-            print(f"\n❌ Failed tests:")
+            report.write(f"\n❌ Failed tests:\n")
             for result in self.test_results:
                 if not result.passed:
-                    print(f"  • {result.name}")
+                    report.write(f"  • {result.name}\n")
         
-        print(f"{'='*60}")
+        report.write(f"{'='*60}\n")
+        sys.stdout.write(report.getvalue())
         sys.stdout.flush()
     
+    @staticmethod
+    def _write_lines(lines: List[str]) -> None:
+        """Write buffered status lines with a single write and flush, then clear the buffer."""
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+            lines.clear()
+    
     def has_failures(self) -> bool:
         """Check if any tests failed."""
-        return any(not r.passed for r in self.test_results)
+        return self._failure_count > 0
+
+def _pytest_framework() -> BaselineTestFramework:
+    """Build a framework rooted at this checkout, independent of pytest's working directory."""
+    return BaselineTestFramework(str(_PROJECT_ROOT / "testData" / "generate_baseline"),
+                                 str(_PROJECT_ROOT / "generate_baseline.py"))
+
+def pytest_generate_tests(metafunc):
+    """Parametrize test_baseline_file with one case per test file so pytest-xdist can spread them."""
+    if "baseline_file" in metafunc.fixturenames:
+        test_files = _pytest_framework().discover_test_files()
+        metafunc.parametrize("baseline_file", test_files, ids=[f.name for f in test_files])
+
+def test_baseline_file(baseline_file):
+    """pytest entry point: run one baseline test file and check it passed."""
+    result = _pytest_framework().run_single_test(baseline_file)
+    assert result.passed, result.message
 
 def main():
+    import argparse  # Only the command line needs it, not imports by pytest or worker processes
+    
     parser = argparse.ArgumentParser(
         description="Test framework for generate_baseline.py",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -268,6 +468,9 @@ Examples:
   python3 test_generate_baseline.py --verbose          # Run with detailed output
   python3 test_generate_baseline.py --update           # Update expected results
   python3 test_generate_baseline.py --test testMulti   # Run specific test
+  python3 test_generate_baseline.py --subprocess       # Run the script in a new process per test
+  python3 test_generate_baseline.py --daemon           # Run tests in one warm runner process
+  python3 test_generate_baseline.py --jobs 4           # Run tests in up to 4 worker processes
         """
     )
     
@@ -281,12 +484,21 @@ Examples:
                        help="Directory containing test files (default: testData/generate_baseline)")
     parser.add_argument("--script", default="generate_baseline.py",
                        help="Path to generate_baseline.py script (default: generate_baseline.py)")
+    parser.add_argument("--subprocess", action="store_true",
+                       help="Run the script in a separate Python process per test instead of in-process")
+    parser.add_argument("--daemon", action="store_true",
+                       help="Run tests in one warm runner_daemon.py process instead of in-process")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                       help="Number of worker processes to run tests in (default: CPU count with --subprocess, otherwise 1; verbose runs are sequential)")
     
     args = parser.parse_args()
     
     try:
-        framework = BaselineTestFramework(args.test_dir, args.script)
-        framework.run_all_tests(args.verbose, args.update, args.test)
+        framework = BaselineTestFramework(args.test_dir, args.script, args.subprocess, args.daemon)
+        try:
+            framework.run_all_tests(args.verbose, args.update, args.test, args.jobs)
+        finally:
+            framework.close()
         framework.print_summary()
         
         # Exit with error code if tests failed